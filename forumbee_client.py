@@ -0,0 +1,176 @@
+"""
+Forumbee API Client
+
+This module holds the Forumbee API calls shared by the fetch scripts:
+fetching the category list and fetching posts for a category.
+It uses the API token and domain from config.py.
+
+Usage:
+    from forumbee_client import get_categories, get_posts
+    categories = get_categories(session)
+    posts = await get_posts(async_session, category_key, fields)
+"""
+
+import csv
+import requests
+from io import StringIO
+from config import DOMAIN
+from http_client import get_with_retry, iter_csv_rows
+
+# Maximum number of posts the API returns per request
+POSTS_PAGE_LIMIT = 1000
+
+# Category types that only group other categories and never hold posts
+CONTAINER_CATEGORY_TYPES = {'container', 'section'}
+
+def get_base_url(domain=DOMAIN):
+    """
+    Build the base URL for the Forumbee API v2 endpoint.
+
+    Args:
+        domain (str): Your Forumbee domain (e.g., 'example.com')
+
+    Returns:
+        str: Base URL of the API
+    """
+    return f"https://{domain}/api/2"
+
+def get_categories(session, fields="name,type,path,categoryKey", domain=DOMAIN):
+    """
+    Fetch all categories from the Forumbee API.
+
+    Args:
+        session (requests.Session): Session used to make the request
+        fields (str): Comma-separated category fields to retrieve
+        domain (str): Your Forumbee domain (e.g., 'example.com')
+
+    Returns:
+        list: List of category dictionaries containing the requested fields
+    """
+    url = f"{get_base_url(domain)}/categories"
+
+    print(f"Making request to: {url}")
+
+    # Define the fields we want to retrieve
+    params = {
+        "fields": fields,
+        "output": "csv"  # Request CSV format
+    }
+
+    try:
+        response = session.get(url, params=params)
+        print(f"Response status code: {response.status_code}")
+
+        response.raise_for_status()
+
+        # Parse CSV response (a single small body, so it is read in one go)
+        csv_data = StringIO(response.text)
+        reader = csv.DictReader(csv_data)
+        categories = list(reader)
+
+        if not categories:
+            print("\nWarning: No categories found in response")
+            return []
+
+        return categories
+
+    except requests.exceptions.HTTPError as http_err:
+        print(f"\nHTTP error occurred: {http_err.response.status_code}")
+        print(f"Error response: {http_err.response.text}")
+        return []
+    except requests.exceptions.RequestException as req_err:
+        print(f"\nRequest error occurred: {req_err}")
+        return []
+    except Exception as err:
+        print(f"\nUnexpected error occurred: {err}")
+        return []
+
+def can_have_posts(category):
+    """
+    Check whether a category can hold posts, based on its type.
+
+    Args:
+        category (dict): Category dictionary including the type field
+
+    Returns:
+        bool: False for container categories, True otherwise
+    """
+    return (category.get('type') or '').lower() not in CONTAINER_CATEGORY_TYPES
+
+async def iter_posts(session, category_key, fields, offset=0, limit=POSTS_PAGE_LIMIT,
+                     text_format=None, domain=DOMAIN, missing='', **extra_params):
+    """
+    Fetch one page of posts for a category, yielding rows as they stream in.
+
+    Args:
+        session (aiohttp.ClientSession): Session used to make the request
+        category_key (str): The key of the category to fetch posts for
+        fields (list): Post fields to retrieve; rows are yielded in this column order
+        offset (int): Offset of the first post in the page
+        limit (int): Maximum number of posts in the page
+        text_format (str): Optional textFormat for post text (e.g., 'plain-truncate-100')
+        domain (str): Your Forumbee domain (e.g., 'example.com')
+        missing: Value used for columns missing from the response or from a short row
+        **extra_params: Additional query parameters for the posts endpoint
+
+    Yields:
+        list: Post row with values in the order of fields (missing for absent columns)
+
+    Raises:
+        aiohttp.ClientError: If the request fails after retries
+    """
+    url = f"{get_base_url(domain)}/posts"
+
+    params = {
+        "categoryLink": category_key,
+        "fields": ",".join(fields),
+        "output": "csv",  # Request CSV format
+        "limit": limit,
+        "offset": offset,
+        "sort": "posted",  # Sort by most recent first
+        **extra_params
+    }
+    if text_format:
+        params["textFormat"] = text_format
+
+    async with await get_with_retry(session, url, params=params) as response:
+        response.raise_for_status()
+
+        rows = iter_csv_rows(response)
+        header = await anext(rows, [])
+        width = len(fields)
+        if not header or header == list(fields):
+            async for row in rows:
+                # Pad short rows so every requested column is present
+                if len(row) < width:
+                    row += [missing] * (width - len(row))
+                yield row
+        else:
+            # Reorder columns to match fields if the API returned a different order;
+            # columns missing from the response (or from a short row) are filled with missing
+            idx = {name: i for i, name in enumerate(header)}
+            columns = [idx.get(name) for name in fields]
+            async for row in rows:
+                yield [row[i] if i is not None and i < len(row) else missing for i in columns]
+
+async def get_posts(session, category_key, fields, offset=0, limit=POSTS_PAGE_LIMIT,
+                    text_format=None, domain=DOMAIN, missing='', **extra_params):
+    """
+    Fetch one page of posts for a category.
+
+    Takes the same arguments as iter_posts. Errors are raised rather than
+    returned as an empty page, so a failed page is never mistaken for the
+    end of the category.
+
+    Returns:
+        list: List of post rows in the order of fields
+
+    Raises:
+        aiohttp.ClientError: If the request fails after retries
+    """
+    return [
+        row async for row in iter_posts(
+            session, category_key, fields, offset=offset, limit=limit,
+            text_format=text_format, domain=domain, missing=missing, **extra_params
+        )
+    ]
@@ -8,194 +8,233 @@ Usage:
     python get-categories-post-list.py
 """
 
-import requests
-import csv
-from io import StringIO
-from config import API_TOKEN, DOMAIN
+import asyncio
+import sys
+from collections import deque
+from itertools import islice
+from forumbee_client import can_have_posts, get_categories, iter_posts, POSTS_PAGE_LIMIT
+from http_client import create_session, create_async_session, MAX_CONCURRENT_REQUESTS
 
-def get_all_categories():
+# Post fields to request (all available fields)
+POST_FIELDS = [
+    'postKey', 'parentKey', 'typeLabel', 'posted', 'active', 'title', 'postStatus',
+    'author.userKey', 'author.name', 'author.handle', 'author.role', 'author.label',
+    'category.name', 'replyCount', 'likeCount', 'viewCount', 'followCount', 'url'
+]
+
+# Column positions of the post fields (field name -> position)
+POST_INDEX = {name: i for i, name in enumerate(POST_FIELDS)}
+
+# Fields printed for each post, grouped by category for better organization
+POST_LAYOUT = [
+    ("Basic Information", [
+        ("Title", 'title', 'N/A'),
+        ("Type", 'typeLabel', 'N/A'),
+        ("Status", 'postStatus', 'N/A'),
+        ("URL", 'url', 'N/A')
+    ]),
+    ("Author Information", [
+        ("Name", 'author.name', 'N/A'),
+        ("Handle", 'author.handle', 'N/A'),
+        ("Role", 'author.role', 'N/A'),
+        ("Label", 'author.label', 'N/A'),
+        ("User Key", 'author.userKey', 'N/A')
+    ]),
+    ("Dates", [
+        ("Posted", 'posted', 'N/A'),
+        ("Last Active", 'active', 'N/A')
+    ]),
+    ("Statistics", [
+        ("Replies", 'replyCount', '0'),
+        ("Likes", 'likeCount', '0'),
+        ("Views", 'viewCount', '0'),
+        ("Followers", 'followCount', '0')
+    ]),
+    ("Keys", [
+        ("Post Key", 'postKey', 'N/A'),
+        ("Parent Key", 'parentKey', 'N/A')
+    ])
+]
+
+def build_post_formatter(layout):
     """
-    Fetch all categories from the Forumbee API.
+    Generate a function that formats a post row using the given layout.
     
+    The layout is fixed when the script starts, so the generated function is a
+    single f-string with every column position baked in. Cells are printed as
+    they are; a field's default is only used when its column was missing from
+    the response (None in the row), as post.get() did for a missing key.
+    
+    Args:
+        layout (list): (section title, [(label, field name, default)]) pairs
+        
     Returns:
-        list: List of category dictionaries containing name, type, and path
+        function: Function taking a post row in POST_FIELDS order and returning its text
     """
-    # Construct the base URL for the API v2 endpoint
-    base_url = f"https://{DOMAIN}/api/2"
-    url = f"{base_url}/categories"
-    
-    print(f"Making request to: {url}")
-    
-    # Set up the request headers with authentication
-    headers = {
-        "Authorization": f"Bearer {API_TOKEN}",
-        "Content-Type": "application/json"
-    }
+    def literal(text):
+        # Braces in titles and labels are literal text, not f-string fields
+        return text.replace('{', '{{').replace('}', '}}')
+    
+    template = ""
+    defaults = []
+    for section, fields in layout:
+        template += f"\n{literal(section)}:\n"
+        for label, field, default in fields:
+            i = POST_INDEX[field]
+            template += f"{literal(label)}: {{d[{len(defaults)}] if r[{i}] is None else r[{i}]}}\n"
+            defaults.append(default)
+    template += "-" * 50 + "\n"
+    
+    # The replacement fields hold no quotes or backslashes, so repr() only ever
+    # escapes the literal text and the source is a valid f-string
+    namespace = {}
+    exec(f"def format_post(r, d={tuple(defaults)!r}):\n    return f{template!r}\n", namespace)
+    return namespace['format_post']
+
+format_post = build_post_formatter(POST_LAYOUT)
+
+async def queue_posts_for_category(session, category_key, queue):
+    """
+    Fetch all posts for a given category and put each row on the queue as
+    soon as it is parsed from the response.
     
-    # Define the fields we want to retrieve
-    params = {
-        "fields": "name,type,path,categoryKey",
-        "output": "csv"
-    }
+    The queue ends with None once every post has been queued, or with the
+    exception raised if the fetch failed.
     
+    Args:
+        session (aiohttp.ClientSession): Session used to make the request
+        category_key (str): The key of the category to fetch posts for
+        queue (asyncio.Queue): Queue receiving the post rows in POST_FIELDS order
+    """
     try:
-        response = requests.get(url, headers=headers, params=params)
-        print(f"Response status code: {response.status_code}")
-        
-        response.raise_for_status()
-        
-        # Parse CSV response
-        csv_data = StringIO(response.text)
-        reader = csv.DictReader(csv_data)
-        categories = list(reader)
-        
-        if not categories:
-            print("\nWarning: No categories found in response")
-            return []
-            
-        return categories
-        
-    except requests.exceptions.HTTPError as http_err:
-        print(f"\nHTTP error occurred: {http_err.response.status_code}")
-        print(f"Error response: {http_err.response.text}")
-        return []
-    except requests.exceptions.RequestException as req_err:
-        print(f"\nRequest error occurred: {req_err}")
-        return []
+        async for post in iter_posts(
+            session,
+            category_key,
+            POST_FIELDS,
+            missing=None,  # Lets format_post tell missing columns from empty cells
+            text_format="plain-truncate-100",  # Get plain text, truncated to 100 chars
+            includeUnlistedCategories="false",
+            includeClosedCategories="false"
+        ):
+            await queue.put(post)
     except Exception as err:
-        print(f"\nUnexpected error occurred: {err}")
-        return []
+        await queue.put(err)
+    else:
+        await queue.put(None)
 
-def get_posts_for_category(category_key):
+def start_category_fetch(session, category):
     """
-    Fetch all posts for a given category.
+    Start fetching the posts of a category in the background.
     
     Args:
-        category_key (str): The key of the category to fetch posts for
+        session (aiohttp.ClientSession): Session used to make the request
+        category (dict): Category dictionary including the categoryKey field
         
     Returns:
-        list: List of post dictionaries
+        tuple: (task, queue) for the fetch, or None if the category has no key
+    """
+    category_key = category.get('categoryKey', '')
+    if not category_key:
+        return None
+    
+    # One page at most, so a fetch never stalls mid-response waiting to be printed
+    queue = asyncio.Queue(maxsize=POSTS_PAGE_LIMIT)
+    task = asyncio.create_task(queue_posts_for_category(session, category_key, queue))
+    return task, queue
+
+async def print_queued_posts(category_key, queue):
     """
-    base_url = f"https://{DOMAIN}/api/2"
-    url = f"{base_url}/posts"
-    
-    headers = {
-        "Authorization": f"Bearer {API_TOKEN}",
-        "Content-Type": "application/json"
-    }
-    
-    # Request all available fields
-    params = {
-        "categoryLink": category_key,
-        "fields": "postKey,parentKey,typeLabel,posted,active,title,postStatus,author.userKey,author.name,author.handle,author.role,author.label,category.name,replyCount,likeCount,viewCount,followCount,url",
-        "output": "csv",
-        "limit": 1000,  # Maximum allowed by API
-        "sort": "posted",  # Sort by most recent first
-        "textFormat": "plain-truncate-100",  # Get plain text, truncated to 100 chars
-        "includeUnlistedCategories": "false",
-        "includeClosedCategories": "false"
-    }
+    Print the posts of a category from its queue as they arrive.
     
-    try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        
-        # Parse CSV response
-        csv_data = StringIO(response.text)
-        reader = csv.DictReader(csv_data)
-        posts = list(reader)
+    Args:
+        category_key (str): The key of the category the posts belong to
+        queue (asyncio.Queue): Queue filled by queue_posts_for_category
         
-        return posts
-    except Exception as err:
-        print(f"Error fetching posts for category {category_key}: {err}")
-        return []
+    Returns:
+        int: Number of posts printed, or None if the fetch failed
+    """
+    count = 0
+    while True:
+        post = await queue.get()
+        if not isinstance(post, list):
+            break
+        sys.stdout.write(format_post(post))
+        count += 1
+    
+    if post is not None:
+        print(f"Error fetching posts for category {category_key}: {post}")
+        return None
+    
+    return count
 
-def print_post_details(post):
+async def main(session):
     """
-    Print all available fields for a post in a formatted way.
+    Fetch all categories, then stream the posts of each category to the
+    terminal in category order.
+    
+    Up to MAX_CONCURRENT_REQUESTS categories are fetched at once. The
+    category being printed is drained from its queue while the ones after
+    it keep fetching, so only the rows not yet printed are held in memory.
     
     Args:
-        post (dict): Dictionary containing post data
+        session (requests.Session): Session used to fetch the category list
     """
-    # Group fields by category for better organization
-    basic_info = {
-        "Title": post.get('title', 'N/A'),
-        "Type": post.get('typeLabel', 'N/A'),
-        "Status": post.get('postStatus', 'N/A'),
-        "URL": post.get('url', 'N/A')
-    }
-    
-    author_info = {
-        "Name": post.get('author.name', 'N/A'),
-        "Handle": post.get('author.handle', 'N/A'),
-        "Role": post.get('author.role', 'N/A'),
-        "Label": post.get('author.label', 'N/A'),
-        "User Key": post.get('author.userKey', 'N/A')
-    }
-    
-    dates = {
-        "Posted": post.get('posted', 'N/A'),
-        "Last Active": post.get('active', 'N/A')
-    }
-    
-    stats = {
-        "Replies": post.get('replyCount', '0'),
-        "Likes": post.get('likeCount', '0'),
-        "Views": post.get('viewCount', '0'),
-        "Followers": post.get('followCount', '0')
-    }
-    
-    keys = {
-        "Post Key": post.get('postKey', 'N/A'),
-        "Parent Key": post.get('parentKey', 'N/A')
-    }
-    
-    # Print all information in organized sections
-    print("\nBasic Information:")
-    for key, value in basic_info.items():
-        print(f"{key}: {value}")
-    
-    print("\nAuthor Information:")
-    for key, value in author_info.items():
-        print(f"{key}: {value}")
-    
-    print("\nDates:")
-    for key, value in dates.items():
-        print(f"{key}: {value}")
-    
-    print("\nStatistics:")
-    for key, value in stats.items():
-        print(f"{key}: {value}")
-    
-    print("\nKeys:")
-    for key, value in keys.items():
-        print(f"{key}: {value}")
-    
-    print("-" * 50)
-
-if __name__ == "__main__":
     print("Starting category and post fetch...")
-    categories = get_all_categories()
-    
-    if categories:
-        for category in categories:
-            category_name = category.get('name', 'N/A')
-            category_key = category.get('categoryKey', '')
-            category_path = category.get('path', 'N/A')
-            
-            print("\n" + "=" * 80)
-            print(f"Category: {category_name}")
-            print(f"Path: {category_path}")
-            print("=" * 80)
-            
-            if category_key:
-                posts = get_posts_for_category(category_key)
-                if posts:
-                    for post in posts:
-                        print_post_details(post)
-                else:
-                    print("No posts found in this category")
-            else:
-                print("No category key available")
-    else:
+    categories = get_categories(session)
+    
+    if not categories:
         print("\nNo categories were returned.")
+        return
+    
+    # Skip container categories, which never hold posts
+    categories = [category for category in categories if can_have_posts(category)]
+    
+    # Buffer the post listing in blocks rather than flushing every line to the terminal
+    sys.stdout.reconfigure(line_buffering=False)
+    
+    async with create_async_session() as async_session:
+        upcoming = iter(categories)
+        fetches = deque()
+        try:
+            while True:
+                # Keep the next few categories fetching ahead of the one being printed
+                for category in islice(upcoming, MAX_CONCURRENT_REQUESTS - len(fetches)):
+                    fetches.append((category, start_category_fetch(async_session, category)))
+                if not fetches:
+                    break
+                
+                category, fetch = fetches[0]
+                category_name = category.get('name', 'N/A')
+                category_key = category.get('categoryKey', '')
+                category_path = category.get('path', 'N/A')
+                
+                print("\n" + "=" * 80)
+                print(f"Category: {category_name}")
+                print(f"Path: {category_path}")
+                print("=" * 80)
+                
+                if fetch:
+                    task, queue = fetch
+                    count = await print_queued_posts(category_key, queue)
+                    await task
+                    if count == 0:
+                        print("No posts found in this category")
+                else:
+                    print("No category key available")
+                
+                # Output is block buffered, so flush once per category
+                sys.stdout.flush()
+                fetches.popleft()
+        finally:
+            # Stop any fetches still running (e.g. after Ctrl+C) before the session closes
+            tasks = [fetch[0] for _, fetch in fetches if fetch]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+if __name__ == "__main__":
+    session = create_session()
+    try:
+        asyncio.run(main(session))
+    finally:
+        session.close()
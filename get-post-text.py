@@ -8,13 +8,30 @@ Usage:
     python get-post-text.py
 """
 
-import requests
+import asyncio
 import json
-import csv
 import os
+import pandas as pd
 from datetime import datetime
-from io import StringIO
-from config import API_TOKEN, DOMAIN
+from config import DOMAIN
+from forumbee_client import can_have_posts, get_categories, get_posts, iter_posts, POSTS_PAGE_LIMIT
+from http_client import create_session, create_async_session, bounded, MAX_CONCURRENT_REQUESTS
+
+# Post fields to request, in the column order used for the output CSV
+POST_FIELDS = ['parentKey', 'category.name', 'author.name', 'title', 'textPlain', 'posted', 'postKey', 'url']
+
+# Post fields to request when fetching several categories at once; the
+# trailing category key is used to group rows and is not written out
+BATCH_FIELDS = POST_FIELDS + ['category.categoryKey']
+
+# Number of pages requested concurrently once a category needs more than one page
+PAGES_AHEAD = 4
+
+# Buffer size in bytes for writing the output CSV
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Timestamp of this run, shared by every file it writes
+RUN_TIMESTAMP = datetime.now().strftime('%Y%m%d_%H%M%S')
 
 def ensure_output_directory():
     """
@@ -25,213 +42,276 @@ def ensure_output_directory():
         os.makedirs(output_dir)
     return output_dir
 
-def get_all_categories():
+async def get_posts_page(session, category_key, offset, limit=POSTS_PAGE_LIMIT, fields=POST_FIELDS):
     """
-    Fetch all categories from the Forumbee API.
+    Fetch a single page of posts for a specific category.
     
+    Args:
+        session (aiohttp.ClientSession): Session used to make the request
+        category_key (str): The key of the category to fetch posts for
+        offset (int): Offset of the first post in the page
+        limit (int): Maximum number of posts in the page
+        fields (list): Post fields to retrieve
+        
     Returns:
-        list: List of category dictionaries containing name, type, and path
+        list: List of post rows in fields order
+        
+    Raises:
+        aiohttp.ClientError: If the page could not be fetched after retries
     """
-    # Construct the base URL for the API v2 endpoint
-    base_url = f"https://{DOMAIN}/api/2"
-    url = f"{base_url}/categories"
-    
-    print(f"Making request to: {url}")
-    
-    # Set up the request headers with authentication
-    headers = {
-        "Authorization": f"Bearer {API_TOKEN}",
-        "Content-Type": "application/json"
-    }
-    
-    # Define the fields we want to retrieve
-    params = {
-        "fields": "name,type,path,categoryKey",
-        "output": "csv"  # Request CSV format
-    }
-    
     try:
-        response = requests.get(url, headers=headers, params=params)
-        print(f"Response status code: {response.status_code}")
-        
-        response.raise_for_status()
-        
-        # Parse CSV response
-        csv_data = StringIO(response.text)
-        reader = csv.DictReader(csv_data)
-        categories = list(reader)
-        
-        if not categories:
-            print("\nWarning: No categories found in response")
-            return []
-            
-        return categories
-        
-    except requests.exceptions.HTTPError as http_err:
-        print(f"\nHTTP error occurred: {http_err.response.status_code}")
-        print(f"Error response: {http_err.response.text}")
-        return []
-    except requests.exceptions.RequestException as req_err:
-        print(f"\nRequest error occurred: {req_err}")
-        return []
+        posts = await get_posts(session, category_key, fields, offset=offset, limit=limit)
     except Exception as err:
-        print(f"\nUnexpected error occurred: {err}")
-        return []
+        print(f"Error fetching posts for category {category_key} at offset {offset}: {err}")
+        raise
+    if posts:
+        print(f"Fetched {len(posts)} posts for category {category_key} (offset: {offset})")
+    return posts
 
-def get_posts_for_category(category_key):
+async def get_posts_for_category(session, category_key, fields=POST_FIELDS):
     """
     Fetch all posts for a specific category using pagination.
     
+    The API does not report how many posts a category holds, so after the
+    first full page the next PAGES_AHEAD pages are requested concurrently.
+    Fetching stops at the first page that comes back short or empty. If a
+    page fails, the rest of its batch is cancelled and the error is raised.
+    
     Args:
+        session (aiohttp.ClientSession): Session used to make the requests
         category_key (str): The key of the category to fetch posts for
+        fields (list): Post fields to retrieve
         
     Returns:
-        list: List of post dictionaries
+        list: List of post rows in fields order
+        
+    Raises:
+        aiohttp.ClientError: If any page could not be fetched after retries
     """
-    base_url = f"https://{DOMAIN}/api/2"
-    url = f"{base_url}/posts"
+    limit = POSTS_PAGE_LIMIT
     
-    headers = {
-        "Authorization": f"Bearer {API_TOKEN}",
-        "Content-Type": "application/json"
-    }
+    posts = await get_posts_page(session, category_key, 0, limit, fields)
+    all_posts = list(posts)
+    offset = limit
     
-    all_posts = []
-    offset = 0
-    limit = 1000  # Maximum allowed per request
-    
-    while True:
-        params = {
-            "categoryLink": category_key,
-            "fields": "postKey,parentKey,title,textPlain,category.name,posted,author.name,url",
-            "output": "csv",  # Request CSV format
-            "limit": limit,
-            "offset": offset,
-            "sort": "posted"  # Sort by most recent first
-        }
-        
+    while len(posts) == limit:
+        # Speculatively request a batch of pages and keep them in offset order
+        offsets = [offset + i * limit for i in range(PAGES_AHEAD)]
+        tasks = [
+            asyncio.create_task(get_posts_page(session, category_key, page_offset, limit, fields))
+            for page_offset in offsets
+        ]
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            # Parse CSV response
-            csv_data = StringIO(response.text)
-            reader = csv.DictReader(csv_data)
-            posts = list(reader)
-            
-            if not posts:
-                break
-                
+            pages = await asyncio.gather(*tasks)
+        except BaseException:
+            # Don't leave the other pages of the batch running in the background
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        for posts in pages:
             all_posts.extend(posts)
-            print(f"Fetched {len(posts)} posts (offset: {offset})")
-            
             if len(posts) < limit:
                 break
-                
-            offset += limit
-            
-        except Exception as err:
-            print(f"Error fetching posts for category {category_key} at offset {offset}: {err}")
-            break
-    
-    print(f"Total posts fetched: {len(all_posts)}")
+        
+        offset += PAGES_AHEAD * limit
+    
+    print(f"Total posts fetched for category {category_key}: {len(all_posts)}")
     return all_posts
 
+async def get_posts_for_categories(session, category_keys):
+    """
+    Fetch all posts for several categories with a single multi-category filter.
+    
+    The category keys are sent comma-separated in one categoryLink, and the
+    rows are grouped back by category using the category.categoryKey field.
+    Categories that come back empty are fetched again one at a time, in case
+    the API did not apply the filter to every key.
+    
+    Args:
+        session (aiohttp.ClientSession): Session used to make the requests
+        category_keys (list): Keys of the categories to fetch posts for
+        
+    Returns:
+        dict: Lists of post rows in POST_FIELDS order by category key (or the
+        exception raised for a category whose posts could not be fetched),
+        or None if the API does not support a multi-category filter
+    """
+    if not category_keys:
+        return {}
+    
+    category_link = ",".join(category_keys)
+    
+    # Probe with a single post; an error, an empty result or a post from another
+    # category means the filter is not supported
+    try:
+        probe = [row async for row in iter_posts(session, category_link, BATCH_FIELDS, limit=1)]
+    except Exception as err:
+        print(f"Multi-category request failed: {err}")
+        return None
+    if not probe or probe[0][-1] not in category_keys:
+        return None
+    
+    try:
+        batch_posts = await get_posts_for_category(session, category_link, BATCH_FIELDS)
+    except Exception as err:
+        print(f"Multi-category request failed: {err}")
+        return None
+    
+    posts_by_key = {category_key: [] for category_key in category_keys}
+    for post in batch_posts:
+        # Strip the trailing category key column so rows match POST_FIELDS
+        category_posts = posts_by_key.get(post.pop())
+        if category_posts is not None:
+            category_posts.append(post)
+    
+    empty_keys = [category_key for category_key, posts in posts_by_key.items() if not posts]
+    if empty_keys:
+        print(f"No posts for {len(empty_keys)} categories in the batched request, "
+              f"fetching them one at a time: {', '.join(empty_keys)}")
+        posts_by_key.update(await get_posts_per_category(session, empty_keys))
+    
+    return posts_by_key
+
+async def get_posts_per_category(session, category_keys):
+    """
+    Fetch all posts for several categories with one request per category,
+    limiting requests in flight.
+    
+    Args:
+        session (aiohttp.ClientSession): Session used to make the requests
+        category_keys (list): Keys of the categories to fetch posts for
+        
+    Returns:
+        dict: Lists of post rows in POST_FIELDS order by category key, or the
+        exception raised for a category whose posts could not be fetched
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    results = await asyncio.gather(*[
+        bounded(semaphore, get_posts_for_category(session, category_key))
+        for category_key in category_keys
+    ], return_exceptions=True)
+    return dict(zip(category_keys, results))
+
 def save_all_posts_to_csv(all_posts, output_dir):
     """
-    Save all posts to a single CSV file with timestamp.
-    Posts are grouped by parentKey to keep related posts together.
+    Save all posts to a single CSV file with the run timestamp.
+    Posts are grouped by parentKey to keep related posts together,
+    using pandas so grouping and sorting are vectorized.
     
     Args:
-        all_posts (list): List of all post dictionaries
+        all_posts (list): List of all post rows in POST_FIELDS order
         output_dir (str): Directory to save the CSV file
     """
     if not all_posts:
         return
     
-    # Create timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
     # Create filename
-    filename = f"{timestamp}_all_posts.csv"
+    filename = f"{RUN_TIMESTAMP}_all_posts.csv"
     filepath = os.path.join(output_dir, filename)
     
-    # Define the field order
-    fieldnames = ['parentKey', 'category.name', 'author.name', 'title', 'textPlain', 'posted', 'postKey', 'url']
+    posts = pd.DataFrame(all_posts, columns=POST_FIELDS)
     
-    # Process posts to ensure full URLs and group related posts
-    processed_posts = []
+    # Ensure full URLs
+    relative = (posts['url'] != '') & ~posts['url'].str.startswith('http')
+    posts.loc[relative, 'url'] = f"https://{DOMAIN}" + posts.loc[relative, 'url']
     
-    # Create a dictionary to store posts by their postKey for easy lookup
-    posts_by_key = {post['postKey']: post for post in all_posts}
+    # Parent posts have no parentKey; every post belongs to the thread of its parent
+    is_reply = posts['parentKey'] != ''
+    posts['thread'] = posts['parentKey'].where(is_reply, posts['postKey'])
+    posts['isReply'] = is_reply
     
-    # First, identify all parent posts (posts without a parentKey)
-    parent_posts = [post for post in all_posts if not post.get('parentKey')]
+    # Attach each parent's posted date and position to its thread
+    # (replies whose parent was not fetched are dropped)
+    parents = posts.loc[~is_reply, ['postKey', 'posted']]
+    parents = parents.rename(columns={'postKey': 'thread', 'posted': 'threadPosted'})
+    parents['threadOrder'] = range(len(parents))
+    processed_posts = posts.merge(parents, on='thread', how='inner')
     
-    # Sort parent posts by posted date (newest first)
-    parent_posts.sort(key=lambda x: x.get('posted', ''), reverse=True)
+    # Parents newest first, each followed by its replies oldest first
+    processed_posts = processed_posts.sort_values(
+        ['threadPosted', 'threadOrder', 'isReply', 'posted'],
+        ascending=[False, True, True, True]
+    )
+    parent_count = int((~processed_posts['isReply']).sum())
     
-    # For each parent post, add it and all its replies
-    for parent in parent_posts:
-        # Add the parent post
-        parent_copy = parent.copy()
-        if parent_copy.get('url') and not parent_copy['url'].startswith('http'):
-            parent_copy['url'] = f"https://{DOMAIN}{parent_copy['url']}"
-        processed_posts.append(parent_copy)
-        
-        # Find all direct replies to this parent
-        replies = [post for post in all_posts if post.get('parentKey') == parent.get('postKey')]
-        
-        # Sort replies by posted date (oldest first)
-        replies.sort(key=lambda x: x.get('posted', ''))
-        
-        # Add each reply
-        for reply in replies:
-            reply_copy = reply.copy()
-            if reply_copy.get('url') and not reply_copy['url'].startswith('http'):
-                reply_copy['url'] = f"https://{DOMAIN}{reply_copy['url']}"
-            processed_posts.append(reply_copy)
-    
-    # Write to CSV
-    with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-        if processed_posts:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(processed_posts)
+    # Write to CSV through a large buffer so rows reach disk in few writes
+    with open(filepath, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as csvfile:
+        if not processed_posts.empty:
+            processed_posts[POST_FIELDS].to_csv(csvfile, index=False, lineterminator='\r\n')
             print(f"\nSaved {len(processed_posts)} total posts to {filename}")
-            print(f"Number of parent posts: {len(parent_posts)}")
-            print(f"Number of reply posts: {len(processed_posts) - len(parent_posts)}")
+            print(f"Number of parent posts: {parent_count}")
+            print(f"Number of reply posts: {len(processed_posts) - parent_count}")
 
-if __name__ == "__main__":
+async def main(session):
+    """
+    Fetch all categories, fetch the posts for every category (in one batched
+    request if possible, otherwise concurrently) and save them to a single CSV file.
+    
+    Args:
+        session (requests.Session): Session used to fetch the category list
+    """
     print("Starting category and post fetch...")
     
     # Ensure output directory exists
     output_dir = ensure_output_directory()
     
-    categories = get_all_categories()
+    categories = get_categories(session)
     all_posts = []
     
-    if categories:
-        for category in categories:
-            category_name = category.get('name', 'N/A')
-            category_key = category.get('categoryKey', '')
-            category_path = category.get('path', 'N/A')
-            
-            print("\n" + "=" * 80)
-            print(f"Category: {category_name}")
-            print(f"Path: {category_path}")
-            print("=" * 80)
-            
-            if category_key:
-                posts = get_posts_for_category(category_key)
-                if posts:
-                    all_posts.extend(posts)
-                else:
-                    print("No posts found in this category")
-            else:
-                print("No category key available")
-        
-        # Save all posts to a single CSV file
-        save_all_posts_to_csv(all_posts, output_dir)
-    else:
+    if not categories:
         print("\nNo categories were returned.")
+        return
+    
+    # Skip container categories, which never hold posts
+    categories = [category for category in categories if can_have_posts(category)]
+    
+    keyed_categories = [category for category in categories if category.get('categoryKey')]
+    category_keys = [category['categoryKey'] for category in keyed_categories]
+    async with create_async_session() as async_session:
+        # Fetch posts for all categories in one request when the API allows it
+        posts_by_key = await get_posts_for_categories(async_session, category_keys)
+        
+        if posts_by_key is None:
+            # Fall back to one request per category
+            print("Fetching posts one category at a time...")
+            posts_by_key = await get_posts_per_category(async_session, category_keys)
+    
+    failed_categories = []
+    
+    for category in categories:
+        category_name = category.get('name', 'N/A')
+        category_key = category.get('categoryKey', '')
+        category_path = category.get('path', 'N/A')
+        
+        print("\n" + "=" * 80)
+        print(f"Category: {category_name}")
+        print(f"Path: {category_path}")
+        print("=" * 80)
+        
+        if category_key:
+            posts = posts_by_key[category_key]
+            if isinstance(posts, BaseException):
+                print(f"Failed to fetch posts for this category: {posts}")
+                failed_categories.append(category_name)
+            elif posts:
+                all_posts.extend(posts)
+            else:
+                print("No posts found in this category")
+        else:
+            print("No category key available")
+    
+    if failed_categories:
+        print(f"\nWarning: output is incomplete, posts could not be fetched for "
+              f"{len(failed_categories)} categories: {', '.join(failed_categories)}")
+    
+    # Save all posts to a single CSV file
+    save_all_posts_to_csv(all_posts, output_dir)
+
+if __name__ == "__main__":
+    session = create_session()
+    try:
+        asyncio.run(main(session))
+    finally:
+        session.close()
@@ -0,0 +1,174 @@
+"""
+Forumbee API HTTP Client
+
+This module creates the requests.Session shared by the calls a script makes
+to the Forumbee API. Reusing one session keeps the connection to the Forumbee
+host alive between requests instead of opening a new TCP/TLS connection for
+every call.
+
+The requests session is meant for one-off calls such as the category list
+and the connection test. The paginated post requests, which make up the bulk
+of the traffic, go through the aiohttp session from create_async_session()
+so they can run concurrently.
+
+Usage:
+    from http_client import create_session
+    session = create_session()
+    response = session.get(url, params=params)
+    session.close()
+"""
+
+import aiohttp
+import asyncio
+import csv
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import API_TOKEN
+
+# Maximum number of post requests in flight at once
+MAX_CONCURRENT_REQUESTS = 10
+
+# Retry policy for transient failures (rate limits, gateway errors), shared by both clients
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = [429, 502, 503, 504]
+
+def get_headers(api_token=API_TOKEN):
+    """
+    Build the request headers sent with every Forumbee API request.
+
+    Args:
+        api_token (str): The Forumbee API token used for authentication
+
+    Returns:
+        dict: Request headers including the bearer token
+    """
+    return {
+        "Authorization": f"Bearer {api_token}",
+        "Content-Type": "application/json",
+        # CSV exports repeat author and category values, so they compress well
+        "Accept-Encoding": "gzip, deflate, br"
+    }
+
+def create_session(api_token=API_TOKEN):
+    """
+    Create a requests session configured for the Forumbee API.
+
+    Args:
+        api_token (str): The Forumbee API token used for authentication
+
+    Returns:
+        requests.Session: Session with auth headers, connection pooling and retries
+    """
+    session = requests.Session()
+
+    # Set up the request headers with authentication and compression
+    session.headers.update(get_headers(api_token))
+
+    # Pool connections and retry transient failures (rate limits, gateway errors)
+    retries = Retry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF_FACTOR, status_forcelist=RETRY_STATUSES)
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+def create_async_session(api_token=API_TOKEN):
+    """
+    Create an aiohttp session configured for the Forumbee API.
+    Must be called from inside a running event loop.
+
+    Args:
+        api_token (str): The Forumbee API token used for authentication
+
+    Returns:
+        aiohttp.ClientSession: Session with auth headers and a bounded connection pool
+    """
+    connector = aiohttp.TCPConnector(limit=16, limit_per_host=8)
+    timeout = aiohttp.ClientTimeout(total=60)
+    return aiohttp.ClientSession(
+        headers=get_headers(api_token),
+        connector=connector,
+        timeout=timeout
+    )
+
+async def get_with_retry(session, url, params=None):
+    """
+    Make a GET request with an aiohttp session, retrying transient failures.
+
+    Rate limits, gateway errors, connection errors and timeouts are retried
+    up to RETRY_TOTAL times with exponential backoff (or the server's
+    Retry-After delay). Only the request and response headers are retried;
+    the caller reads the body.
+
+    Args:
+        session (aiohttp.ClientSession): Session used to make the request
+        url (str): URL to request
+        params (dict): Query parameters
+
+    Returns:
+        aiohttp.ClientResponse: The response; use it with "async with" to release it
+
+    Raises:
+        aiohttp.ClientError: If the request still fails after all retries
+        asyncio.TimeoutError: If the last attempt timed out
+    """
+    for attempt in range(RETRY_TOTAL + 1):
+        delay = RETRY_BACKOFF_FACTOR * (2 ** attempt)
+        try:
+            response = await session.get(url, params=params)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == RETRY_TOTAL:
+                raise
+        else:
+            if response.status not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+                return response
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = int(retry_after)
+            response.release()
+        await asyncio.sleep(delay)
+
+async def bounded(semaphore, coro):
+    """
+    Await a coroutine while holding a semaphore slot.
+
+    Args:
+        semaphore (asyncio.Semaphore): Semaphore limiting concurrent requests
+        coro (coroutine): The coroutine to run
+
+    Returns:
+        The result of the coroutine
+    """
+    async with semaphore:
+        return await coro
+
+async def iter_csv_rows(response):
+    """
+    Parse a CSV response body row by row as it streams in, without reading
+    the whole body into memory first.
+
+    Lines are collected until their quotes balance, so fields containing
+    newlines (e.g. post text) stay in a single row.
+
+    Args:
+        response (aiohttp.ClientResponse): Response with a CSV body
+
+    Yields:
+        list: The fields of each CSV row, starting with the header row
+    """
+    parts = []
+    quotes = 0
+    async for line in response.content:
+        text = line.decode('utf-8')
+        parts.append(text)
+        quotes += text.count('"')
+        # A record is complete once its quotes are balanced
+        if quotes % 2 == 0:
+            record = ''.join(parts)
+            parts = []
+            if record.strip():
+                yield next(csv.reader([record]))
+    if parts:
+        yield next(csv.reader([''.join(parts)]))
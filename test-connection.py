@@ -8,12 +8,31 @@ Usage:
     python test-connection.py --token "your-api-token" --domain "example.com"
     OR
     python test-connection.py (uses values from config.py)
+
+Set LOG_LEVEL=DEBUG to also print a sample API response.
 """
 
 import requests
 import argparse
+import logging
+import orjson
+import os
 import re
 from config import API_TOKEN, DOMAIN
+from forumbee_client import get_base_url
+from http_client import create_session
+
+logger = logging.getLogger(__name__)
+
+# Protocol prefix stripped from domains (http:// or https://)
+_PROTO_RE = re.compile(r'^https?://')
+
+# Domain validation - allows subdomains and common TLDs
+_DOMAIN_RE = re.compile(
+    r'^[a-zA-Z0-9][a-zA-Z0-9-]{0,61}[a-zA-Z0-9]'
+    r'(?:\.[a-zA-Z0-9][a-zA-Z0-9-]{0,61}[a-zA-Z0-9])*'
+    r'\.[a-zA-Z]{2,}$'
+)
 
 def validate_domain(domain):
     """
@@ -29,16 +48,11 @@ def validate_domain(domain):
         ValueError: If the domain format is invalid
     """
     # Remove any protocol (http:// or https://)
-    domain = re.sub(r'^https?://', '', domain)
+    domain = _PROTO_RE.sub('', domain)
     # Remove any trailing slashes
     domain = domain.rstrip('/')
     # Domain validation - allows subdomains and common TLDs
-    if not re.match(
-        r'^[a-zA-Z0-9][a-zA-Z0-9-]{0,61}[a-zA-Z0-9]'
-        r'(?:\.[a-zA-Z0-9][a-zA-Z0-9-]{0,61}[a-zA-Z0-9])*'
-        r'\.[a-zA-Z]{2,}$',
-        domain
-    ):
+    if not _DOMAIN_RE.match(domain):
         raise ValueError(
             "Invalid domain format. Please provide a valid domain "
             "(e.g., 'example.com' or 'subdomain.example.com')"
@@ -57,35 +71,40 @@ def test_connection(api_token, domain):
     1. Validate and clean the domain
     2. Construct the API URL
     3. Make a GET request to fetch one post
-    4. Print the response or any errors that occur
+    4. Print the result or any errors that occur (the sample response is logged at DEBUG level)
     """
     # Validate and clean the domain
     clean_domain = validate_domain(domain)
     # Construct the base URL for the API v2 endpoint
-    base_url = f"https://{clean_domain}/api/2"
+    base_url = get_base_url(clean_domain)
     
-    # Set up the request headers with authentication
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json"
-    }
+    # Set up a session with authentication headers for the given token
+    session = create_session(api_token)
     
     # Construct the full URL for the posts endpoint
     test_url = f"{base_url}/posts"
     try:
         # Make the API request with a limit of 1 post
-        response = requests.get(test_url, headers=headers, params={"limit": 1})
+        response = session.get(test_url, params={"limit": 1})
         response.raise_for_status()  # Raise an exception for bad status codes
         print("API connection successful.")
-        print("Sample response:", response.json())
+        print(f"Response encoding: {response.headers.get('Content-Encoding', 'identity')}")
+        # A successful status is enough; only decode the body when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sample response: %s", orjson.loads(response.content))
     except requests.exceptions.HTTPError as http_err:
         # Handle HTTP-specific errors (e.g., 401 Unauthorized, 404 Not Found)
         print(f"HTTP error occurred: {http_err.response.status_code} - {http_err.response.text}")
     except Exception as err:
         # Handle other potential errors (e.g., network issues)
         print(f"Other error occurred: {err}")
+    finally:
+        session.close()
 
 if __name__ == "__main__":
+    # Log level comes from the environment, e.g. LOG_LEVEL=DEBUG
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING").upper())
+    
     # Set up command-line argument parsing
     parser = argparse.ArgumentParser(description='Test Forumbee API connection')
     parser.add_argument('--token', help='Your Forumbee API token (optional if using config.py)')
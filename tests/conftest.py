@@ -0,0 +1,90 @@
+"""
+Shared test setup: makes the scripts importable and serves canned API
+responses from a local HTTP server.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# config.py holds real credentials and is not checked in
+if 'config' not in sys.modules:
+    sys.modules['config'] = types.SimpleNamespace(API_TOKEN="test-token", DOMAIN="example.com")
+
+def load_script(filename):
+    """Import one of the hyphen-named scripts as a module."""
+    name = os.path.splitext(filename)[0].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class StubServer:
+    """
+    Local HTTP server returning queued responses by request path.
+
+    Responses for a path are served in order; the last one repeats. A handler
+    registered for a path instead builds the response from the query string.
+    """
+
+    def __init__(self):
+        self.responses = {}
+        self.handlers = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                stub.requests.append(self.path)
+                if parsed.path in stub.handlers:
+                    query = {name: values[0] for name, values in parse_qs(parsed.query).items()}
+                    status, body, headers = stub.handlers[parsed.path](query)
+                else:
+                    queue = stub.responses.get(parsed.path, [(404, b"", {})])
+                    status, body, headers = queue.pop(0) if len(queue) > 1 else queue[0]
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/api/2"
+
+    def add(self, path, body, status=200, headers=None):
+        """Queue a response for the given path."""
+        self.responses.setdefault(path, []).append((status, body, headers or {}))
+
+    def add_handler(self, path, handler):
+        """Serve the given path with handler(query) -> (status, body, headers)."""
+        self.handlers[path] = handler
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    import forumbee_client
+
+    stub = StubServer()
+    stub.thread.start()
+    monkeypatch.setattr(forumbee_client, "get_base_url", lambda domain=None: stub.base_url)
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
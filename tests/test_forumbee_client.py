@@ -0,0 +1,83 @@
+import asyncio
+import gzip
+
+import aiohttp
+import pytest
+
+from forumbee_client import can_have_posts, get_categories, get_posts
+from http_client import create_async_session, create_session
+
+CATEGORIES_CSV = (
+    b'name,type,path,categoryKey\r\n'
+    b'General,discussion,/general,k1\r\n'
+    b'"Board, Minutes",discussion,/minutes,k2\r\n'
+)
+
+def test_get_categories_parses_csv(stub_server):
+    stub_server.add("/api/2/categories", CATEGORIES_CSV, headers={"Content-Type": "text/csv"})
+    session = create_session("test-token")
+    try:
+        categories = get_categories(session)
+    finally:
+        session.close()
+
+    assert [category['name'] for category in categories] == ["General", "Board, Minutes"]
+    assert categories[1]['categoryKey'] == "k2"
+
+def test_get_categories_parses_gzip_csv(stub_server):
+    stub_server.add(
+        "/api/2/categories",
+        gzip.compress(CATEGORIES_CSV),
+        headers={"Content-Type": "text/csv", "Content-Encoding": "gzip"}
+    )
+    session = create_session("test-token")
+    try:
+        categories = get_categories(session)
+    finally:
+        session.close()
+
+    assert [category['categoryKey'] for category in categories] == ["k1", "k2"]
+
+POSTS_CSV = (
+    b'postKey,title,textPlain\r\n'
+    b'p1,First,"Line one\r\nLine two"\r\n'
+    b'p2,Second,Short\r\n'
+)
+
+def fetch_posts(fields, **kwargs):
+    async def run():
+        async with create_async_session("test-token") as async_session:
+            return await get_posts(async_session, "k1", fields, **kwargs)
+    return asyncio.run(run())
+
+def test_get_posts_retries_transient_errors(stub_server):
+    stub_server.add("/api/2/posts", b"busy", status=503)
+    stub_server.add("/api/2/posts", POSTS_CSV, headers={"Content-Type": "text/csv"})
+
+    posts = fetch_posts(['postKey', 'title', 'textPlain'])
+
+    assert posts == [['p1', 'First', 'Line one\r\nLine two'], ['p2', 'Second', 'Short']]
+    assert len(stub_server.requests) == 2
+
+def test_get_posts_raises_instead_of_returning_empty_page(stub_server):
+    stub_server.add("/api/2/posts", b"error", status=500)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        fetch_posts(['postKey', 'title', 'textPlain'])
+
+def test_get_posts_fills_missing_columns(stub_server):
+    stub_server.add(
+        "/api/2/posts",
+        b'title,postKey\r\nFirst,p1\r\nSecond\r\n',
+        headers={"Content-Type": "text/csv"}
+    )
+
+    posts = fetch_posts(['postKey', 'title', 'textPlain'])
+
+    assert posts == [['p1', 'First', ''], ['', 'Second', '']]
+
+def test_can_have_posts_skips_containers_and_tolerates_missing_type():
+    assert not can_have_posts({'type': 'Container'})
+    assert can_have_posts({'type': 'discussion'})
+    assert can_have_posts({'type': None})
+    assert can_have_posts({})
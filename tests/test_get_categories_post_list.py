@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+from conftest import load_script
+from http_client import create_session
+
+get_categories_post_list = load_script("get-categories-post-list.py")
+
+def test_main_prints_categories_in_order_while_fetching_concurrently(stub_server, capsys):
+    stub_server.add(
+        "/api/2/categories",
+        b'name,type,path,categoryKey\r\nSlow,discussion,/slow,k1\r\nFast,discussion,/fast,k2\r\n'
+        b'Empty,discussion,/empty,k3\r\nNo Key,discussion,/none,\r\n',
+        headers={"Content-Type": "text/csv"}
+    )
+    fields = ",".join(get_categories_post_list.POST_FIELDS)
+    later_category_requested = threading.Event()
+    overlapped = []
+
+    def posts(query):
+        category_key = query["categoryLink"]
+        if category_key == "k1":
+            # The first category only answers once a later one has been requested
+            overlapped.append(later_category_requested.wait(timeout=5))
+        else:
+            later_category_requested.set()
+        rows = [] if category_key == "k3" else [f"post-{category_key}-{i}" for i in range(2)]
+        body = fields + "\r\n" + "".join(f"{row}\r\n" for row in rows)
+        return 200, body.encode(), {"Content-Type": "text/csv"}
+
+    stub_server.add_handler("/api/2/posts", posts)
+
+    session = create_session("test-token")
+    try:
+        asyncio.run(get_categories_post_list.main(session))
+    finally:
+        session.close()
+
+    out = capsys.readouterr().out
+    order = [line for line in out.splitlines() if line.startswith(("Category:", "Post Key:", "No "))]
+    assert order == [
+        "Category: Slow", "Post Key: post-k1-0", "Post Key: post-k1-1",
+        "Category: Fast", "Post Key: post-k2-0", "Post Key: post-k2-1",
+        "Category: Empty", "No posts found in this category",
+        "Category: No Key", "No category key available",
+    ]
+    assert overlapped == [True]
+
+def baseline_print_post_details(post):
+    """print_post_details from before the formatter was generated, for comparison."""
+    sections = [
+        ("Basic Information", {
+            "Title": post.get('title', 'N/A'),
+            "Type": post.get('typeLabel', 'N/A'),
+            "Status": post.get('postStatus', 'N/A'),
+            "URL": post.get('url', 'N/A')
+        }),
+        ("Author Information", {
+            "Name": post.get('author.name', 'N/A'),
+            "Handle": post.get('author.handle', 'N/A'),
+            "Role": post.get('author.role', 'N/A'),
+            "Label": post.get('author.label', 'N/A'),
+            "User Key": post.get('author.userKey', 'N/A')
+        }),
+        ("Dates", {
+            "Posted": post.get('posted', 'N/A'),
+            "Last Active": post.get('active', 'N/A')
+        }),
+        ("Statistics", {
+            "Replies": post.get('replyCount', '0'),
+            "Likes": post.get('likeCount', '0'),
+            "Views": post.get('viewCount', '0'),
+            "Followers": post.get('followCount', '0')
+        }),
+        ("Keys", {
+            "Post Key": post.get('postKey', 'N/A'),
+            "Parent Key": post.get('parentKey', 'N/A')
+        })
+    ]
+    for title, values in sections:
+        print(f"\n{title}:")
+        for key, value in values.items():
+            print(f"{key}: {value}")
+    print("-" * 50)
+
+def test_format_post_matches_baseline_output(capsys):
+    fields = get_categories_post_list.POST_FIELDS
+    post = dict.fromkeys(fields, '')
+    post.update({'postKey': 'p1', 'title': 'Hello {there}', 'author.name': 'Ann', 'likeCount': '3'})
+    # Columns the response did not include are absent from the baseline dict
+    # and None in the row
+    absent = {'viewCount', 'author.role'}
+    row = [None if field in absent else post[field] for field in fields]
+    baseline_post = {field: value for field, value in post.items() if field not in absent}
+
+    baseline_print_post_details(baseline_post)
+    expected = capsys.readouterr().out
+
+    assert get_categories_post_list.format_post(row) == expected
+    assert "Parent Key: \n" in expected and "Views: 0\n" in expected
+
+def test_build_post_formatter_keeps_quotes_and_braces_in_labels():
+    layout = [('Odd "section" {x}', [("It's \\ \"quoted\" {y}", 'title', 'N/A')])]
+
+    format_post = get_categories_post_list.build_post_formatter(layout)
+
+    row = [None] * len(get_categories_post_list.POST_FIELDS)
+    expected = '\nOdd "section" {x}:\nIt\'s \\ "quoted" {y}: N/A\n' + "-" * 50 + "\n"
+    assert format_post(row) == expected
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import time
+
+import aiohttp
+import pytest
+
+from conftest import load_script
+from http_client import create_async_session
+
+get_post_text = load_script("get-post-text.py")
+
+def make_post(post_key, parent_key, posted, url=''):
+    post = dict.fromkeys(get_post_text.POST_FIELDS, '')
+    post.update(postKey=post_key, parentKey=parent_key, posted=posted, url=url, title=f'Title "{post_key}"')
+    return [post[field] for field in get_post_text.POST_FIELDS]
+
+def test_save_all_posts_groups_replies_under_parents(tmp_path):
+    posts = [
+        make_post('r2', 'p1', '2025-01-03'),
+        make_post('p1', '', '2025-01-01', url='/t/p1'),
+        make_post('p2', '', '2025-02-01', url='https://example.com/t/p2'),
+        make_post('r1', 'p1', '2025-01-02'),
+        make_post('orphan', 'missing', '2025-01-05'),
+    ]
+
+    get_post_text.save_all_posts_to_csv(posts, str(tmp_path))
+
+    [filename] = os.listdir(tmp_path)
+    with open(tmp_path / filename, 'rb') as csvfile:
+        lines = csvfile.read().split(b'\r\n')
+
+    assert lines[0] == b'parentKey,category.name,author.name,title,textPlain,posted,postKey,url'
+    assert [line.split(b',')[6] for line in lines[1:-1]] == [b'p2', b'p1', b'r1', b'r2']
+    assert lines[2] == b',,,"Title ""p1""",,2025-01-01,p1,https://example.com/t/p1'
+    assert lines[-1] == b''
+
+def test_batched_fetch_refetches_categories_missing_from_the_batch(stub_server):
+    fields = get_post_text.BATCH_FIELDS
+
+    def posts_csv(category_key):
+        post = make_post(f'post-{category_key}', '', '2025-01-01') + [category_key]
+        return (",".join(fields) + "\r\n" + ",".join(f'"{value}"' for value in post) + "\r\n").encode()
+
+    def handler(query):
+        # Simulate an API that only applies the first key of a combined filter
+        category_key = query['categoryLink'].split(',')[0]
+        return 200, posts_csv(category_key), {"Content-Type": "text/csv"}
+
+    stub_server.add_handler("/api/2/posts", handler)
+
+    async def run():
+        async with create_async_session("test-token") as async_session:
+            return await get_post_text.get_posts_for_categories(async_session, ['k1', 'k2'])
+
+    posts_by_key = asyncio.run(run())
+
+    assert {key: [post[6] for post in posts] for key, posts in posts_by_key.items()} == {
+        'k1': ['post-k1'],
+        'k2': ['post-k2'],
+    }
+
+def serve_pages(stub_server, post_count, fail_offset=None):
+    """Serve post_count posts by offset and limit, later pages answering first."""
+    fields = get_post_text.POST_FIELDS
+    posts = [make_post(f'p{i}', '', f'2025-01-{i + 1:02d}') for i in range(post_count)]
+
+    def handler(query):
+        offset, limit = int(query['offset']), int(query['limit'])
+        if offset == fail_offset:
+            return 500, b"error", {}
+        time.sleep(max(0, 10 - offset) * 0.02)
+        body = ",".join(fields) + "\r\n"
+        body += "".join(",".join(post) + "\r\n" for post in posts[offset:offset + limit])
+        return 200, body.encode(), {"Content-Type": "text/csv"}
+
+    stub_server.add_handler("/api/2/posts", handler)
+    return posts
+
+def fetch_category(monkeypatch):
+    monkeypatch.setattr(get_post_text, "POSTS_PAGE_LIMIT", 2)
+
+    async def run():
+        async with create_async_session("test-token") as async_session:
+            try:
+                return await get_post_text.get_posts_for_category(async_session, 'k1')
+            finally:
+                # No page requests may be left running once the fetch returns or raises
+                assert asyncio.all_tasks() == {asyncio.current_task()}
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("post_count", [5, 4])
+def test_read_ahead_returns_every_page_in_order(stub_server, monkeypatch, post_count):
+    posts = serve_pages(stub_server, post_count)
+
+    assert fetch_category(monkeypatch) == posts
+    offsets = sorted(int(path.split('offset=')[1].split('&')[0]) for path in stub_server.requests)
+    assert offsets == [0, 2, 4, 6, 8]
+
+def test_read_ahead_cancels_the_batch_when_a_page_fails(stub_server, monkeypatch):
+    serve_pages(stub_server, 20, fail_offset=6)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        fetch_category(monkeypatch)